@@ -5,18 +5,36 @@ Simple version that only exports device ID and name.
 """
 
 import csv
+import json
+import logging
 import os
+import re
 import argparse
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("ha_shelly")
 
 # Check for required modules
 missing_modules = []
 try:
     import requests
+    import urllib3
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     missing_modules.append("requests")
 
+try:
+    import ijson
+except ImportError:
+    missing_modules.append("ijson")
+
 try:
     from dotenv import load_dotenv
 except ImportError:
@@ -24,196 +42,401 @@ except ImportError:
 
 # If modules are missing, provide instructions
 if missing_modules:
-    print("ERROR: Missing required Python modules:", ", ".join(missing_modules))
-    print("\nTo install the missing modules, run the following command:")
-    print(f"pip install {' '.join(missing_modules)}")
-    print("\nIf you have multiple Python versions installed, you might need to use:")
-    print(f"pip3 install {' '.join(missing_modules)}")
+    logger.error("Missing required Python modules: %s", ", ".join(missing_modules))
+    logger.error("To install the missing modules, run the following command:")
+    logger.error("pip install %s", " ".join(missing_modules))
+    logger.error("If you have multiple Python versions installed, you might need to use:")
+    logger.error("pip3 install %s", " ".join(missing_modules))
     sys.exit(1)
 
-def get_shelly_devices(ha_url, token):
-    """Get Shelly device entities from Home Assistant API"""
-    headers = {
+def create_session(token):
+    """Create a pooled, authenticated HTTP session for one Home Assistant instance"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=10,
+        # Return the final 5xx response instead of raising, so it reaches the status diagnostics
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
-    }
+        "Accept-Encoding": "gzip, deflate",
+    })
+    return session
+
+# Sidecars remembering the /api/states ETag and CSV of each instance's last export,
+# and the exported name of every entity as of the last --since-last-run export
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ha-shelly-exporter")
+ETAG_CACHE_FILE = os.path.join(CACHE_DIR, "etag.json")
+STATE_CACHE_FILE = os.path.join(CACHE_DIR, "state.json")
+
+# Entity filter: all covers, but only Shelly switches (never availability/connectivity entities)
+_SHELLY_SWITCH_RE = re.compile(r"^switch\.[^.]*shelly", re.I)
+_COVER_PREFIX = "cover."
+_EXCLUDE = ("availability", "connectivity")
+_get_eid_attr = itemgetter("entity_id", "attributes")
+_CSV_NEEDS_QUOTING = re.compile(r'[,"\r\n]')
+
+def _matches(entity_id):
+    """Return True if the entity ID should be exported"""
+    return bool(
+        (_SHELLY_SWITCH_RE.match(entity_id) or entity_id.startswith(_COVER_PREFIX))
+        and not any(x in entity_id for x in _EXCLUDE)
+    )
+
+def _load_cache(path):
+    """Load a JSON cache sidecar, returning an empty dict if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(path, data):
+    """Atomically replace a JSON cache sidecar"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not update cache file %s: %s", path, e)
+
+def _file_signature(path):
+    """Return [size, mtime_ns] of a file (JSON-friendly), or None if it cannot be stat'ed"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+def _format_csv_row(entity_id, friendly_name):
+    """Format a CSV row by hand, quoting like csv.writer does; entity IDs never need quoting"""
+    name = str(friendly_name)
+    if _CSV_NEEDS_QUOTING.search(name):
+        name = '"' + name.replace('"', '""') + '"'
+    return f"{entity_id},{name}\r\n"
+
+def iter_shelly_devices(entities):
+    """Yield (entity_id, friendly_name) for each Shelly device entity"""
+    for entity in entities:
+        try:
+            entity_id, attributes = _get_eid_attr(entity)
+        except KeyError:
+            continue
+        if _matches(entity_id):
+            friendly_name = attributes.get("friendly_name") or entity_id
+            logger.debug("Found Shelly device: %s (%s)", entity_id, friendly_name)
+            yield entity_id, friendly_name
+
+def _diagnose_api_failure(session, ha_url):
+    """Probe /api/config after a failed states request to explain what went wrong"""
+    config_url = f"{ha_url}/api/config"
+    logger.info("Checking API connection at: %s", config_url)
+    try:
+        config_status = session.get(config_url, timeout=30).status_code
+    except requests.exceptions.RequestException as e:
+        logger.error("Home Assistant at %s is not reachable: %s", ha_url, e)
+        return
     
+    if config_status in (401, 403):
+        logger.error("Authentication failed at %s (status %s). Check that the token is valid and has not been revoked.", ha_url, config_status)
+    elif config_status == 404:
+        logger.error("No Home Assistant API found at %s (status 404). Check that the URL is correct.", ha_url)
+    elif config_status == 200:
+        logger.error("The API at %s is accessible, but the states could not be read. Home Assistant may still be starting up.", ha_url)
+    else:
+        logger.error("Home Assistant API at %s returned status %s. It may be down or restarting.", ha_url, config_status)
+
+def _iter_changed_devices(devices, previous_names, current_names):
+    """Yield only devices whose exported row differs from the previous names, recording every name seen"""
+    for entity_id, friendly_name in devices:
+        current_names[entity_id] = friendly_name
+        if previous_names.get(entity_id) != friendly_name:
+            yield entity_id, friendly_name
+
+def stream_shelly_to_csv(session, ha_url, output_file, safe_csv=False, etag_cache=None, state_cache=None):
+    """Stream Shelly device entities from Home Assistant API into a CSV file; returns the row count, or None on failure"""
     # Ensure URL doesn't end with a slash
     if ha_url.endswith('/'):
         ha_url = ha_url[:-1]
     
-    # Check if API is accessible
-    config_url = f"{ha_url}/api/config"
-    print(f"Testing API connection at: {config_url}")
-    
+    states_response = None
     try:
-        # Check if API is accessible
-        config_response = requests.get(config_url, headers=headers, timeout=30)
-        if config_response.status_code != 200:
-            print(f"Error: Unable to access Home Assistant API. Status code: {config_response.status_code}")
-            print("This suggests a problem with authentication or the API is not accessible.")
-            return []
+        # Get all entities from states endpoint; its status code doubles as the connection check
+        states_url = f"{ha_url}/api/states"
+        logger.info("Getting entities from: %s", states_url)
+        # etag_cache (if given) maps states URL -> last export and is updated in place;
+        # output_file must be absolute since it is recorded there as csv_path.
+        # Ask for a 304 only if the last export is still on disk exactly as we wrote it
+        cached = etag_cache.get(states_url) if etag_cache is not None else None
+        if cached and cached.get("signature") and _file_signature(cached["csv_path"]) == cached["signature"]:
+            headers = {"If-None-Match": cached["etag"]}
         else:
-            print("Successfully connected to Home Assistant API")
+            cached = None
+            headers = None
+        states_response = session.get(states_url, headers=headers, stream=True, timeout=30)
         
-        # Get all entities from states endpoint
-        states_url = f"{ha_url}/api/states"
-        print(f"Getting entities from: {states_url}")
-        states_response = requests.get(states_url, headers=headers, timeout=30)
+        if states_response.status_code == 304 and cached:
+            logger.info("States at %s unchanged since last export, reusing %s", ha_url, cached["csv_path"])
+            if output_file != cached["csv_path"]:
+                shutil.copyfile(cached["csv_path"], output_file)
+            cached["csv_path"] = output_file
+            cached["signature"] = _file_signature(output_file)
+            return cached["rows"]
         
         if states_response.status_code != 200:
-            print(f"Error: Unable to get states. Status code: {states_response.status_code}")
-            return []
+            logger.error("Unable to get states from %s. Status code: %s", ha_url, states_response.status_code)
+            # Hand the connection back before the diagnostic probe needs one
+            states_response.close()
+            _diagnose_api_failure(session, ha_url)
+            return None
             
-        all_entities = states_response.json()
-        print(f"Retrieved {len(all_entities)} total entities from Home Assistant")
+        # Parse the states array incrementally so rows are written as entities arrive;
+        # urllib3 decompresses the gzip/deflate body chunk by chunk as ijson reads it
+        logger.debug("States response encoding: %s", states_response.headers.get("Content-Encoding", "identity"))
+        states_response.raw.decode_content = True
+        devices = iter_shelly_devices(ijson.items(states_response.raw, "item"))
+        # state_cache (if given) holds the names of the last delta export; only added or
+        # renamed entities are written, and it is updated in place with the current names
+        if state_cache is not None:
+            current_names = {}
+            devices = _iter_changed_devices(devices, state_cache.get(states_url, {}), current_names)
         
-        # Filter for Shelly device entities
-        shelly_devices = []
-        seen_ids = set()  # To prevent duplicates
+        # Only create the CSV file once the first matching entity has arrived
+        first_device = next(devices, None)
+        if first_device is None:
+            if state_cache is not None:
+                logger.info("No Shelly device entities changed at %s since the last run. CSV file will not be created.", ha_url)
+            else:
+                logger.info("No Shelly device entities to export from %s. CSV file will not be created.", ha_url)
+            if etag_cache is not None:
+                etag_cache.pop(states_url, None)
+            if state_cache is not None:
+                state_cache[states_url] = current_names
+            return 0
         
-        # Process switch entities
-        for entity in all_entities:
-            entity_id = entity.get("entity_id", "")
-            attributes = entity.get("attributes", {})
-            friendly_name = attributes.get("friendly_name", entity_id)
-            
-            # Only process switch or cover entities
-            # User requested: All covers, but only Shelly switches
-            is_switch = entity_id.startswith("switch.") and "shelly" in entity_id.lower()
-            is_cover = entity_id.startswith("cover.")
-            is_availability = "availability" in entity_id.lower() or "connectivity" in entity_id.lower()
-            
-            if (is_switch or is_cover) and not is_availability:
-                # Check if this is a duplicate
-                if entity_id not in seen_ids:
-                    seen_ids.add(entity_id)
-                    print(f"Found Shelly device: {entity_id} ({friendly_name})")
-                    
-                    shelly_devices.append({
-                        "id": entity_id,
-                        "name": friendly_name
-                    })
+        logger.debug("Attempting to create file: %s", output_file)
+        
+        # Write beside the target and move it into place only once the whole body has arrived,
+        # so a dropped connection or bad JSON never leaves a truncated CSV behind
+        tmp_path = f"{output_file}.tmp"
+        try:
+            with open(tmp_path, 'w', newline='', buffering=1 << 20, encoding='utf-8') as csvfile:
+                if safe_csv:
+                    write_row = csv.writer(csvfile).writerow
+                else:
+                    def write_row(device):
+                        csvfile.write(_format_csv_row(*device))
+                
+                csvfile.write("id,name\r\n")
+                write_row(first_device)
+                n = 1
+                for device in devices:
+                    write_row(device)
+                    n += 1
+            os.replace(tmp_path, output_file)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        
+        logger.info("Successfully exported %d Shelly device entities from %s to %s", n, ha_url, output_file)
         
-        print(f"\nFound {len(shelly_devices)} unique Shelly device entities")
-        return shelly_devices
+        if state_cache is not None:
+            state_cache[states_url] = current_names
+        
+        etag = states_response.headers.get("ETag")
+        if etag_cache is not None:
+            if etag:
+                etag_cache[states_url] = {
+                    "etag": etag,
+                    "csv_path": output_file,
+                    "signature": _file_signature(output_file),
+                    "rows": n,
+                }
+            else:
+                etag_cache.pop(states_url, None)
+        return n
     
-    except requests.exceptions.RequestException as e:
-        print(f"Connection error: {e}")
-        return []
-    except ValueError as e:
-        print(f"JSON parsing error: {e}")
-        return []
+    except PermissionError:
+        logger.error("Permission denied when writing the export from %s to %s", ha_url, output_file)
+        logger.error("Try specifying a different output location or run with administrator privileges")
+        return None
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
+        # Once ijson reads the raw stream, dropped connections surface as urllib3 errors
+        logger.error("Connection error for %s: %s", ha_url, e)
+        return None
+    except (ValueError, ijson.JSONError) as e:
+        logger.error("JSON parsing error for %s: %s", ha_url, e)
+        return None
     except Exception as e:
-        print(f"Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
-
-def export_to_csv(entities, output_file=None):
-    """Export the entities list to a CSV file"""
-    if not entities:
-        print("No Shelly device entities to export. CSV file will not be created.")
+        logger.exception("Unexpected error for %s: %s", ha_url, e)
         return None
-        
-    if not output_file:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = f"shelly_devices_{timestamp}.csv"
+    finally:
+        # Streamed responses hold their pooled connection until closed
+        if states_response is not None:
+            states_response.close()
+
+def _host_output_file(output_file, ha_url):
+    """Derive a per-instance output file name by appending the URL's host (and port)"""
+    parts = urlsplit(ha_url)
+    host = parts.hostname or "ha"
+    if parts.port:
+        host = f"{host}_{parts.port}"
+    root, ext = os.path.splitext(output_file)
+    return f"{root}_{host}{ext}"
+
+def log_export_summary(ha_url, output_file, exported, since_last_run=False):
+    """Log the export summary and a CSV preview for one Home Assistant instance"""
+    if exported == 0 and since_last_run:
+        logger.info("No Shelly device entities changed at %s since the last run", ha_url)
+        return
     
-    # Print current working directory for debugging
-    print(f"Current working directory: {os.getcwd()}")
-    print(f"Attempting to create file: {output_file}")
+    if not exported:
+        if exported is None:
+            logger.info("Export from %s failed. Please check:", ha_url)
+        else:
+            logger.info("No Shelly device entities found at %s. Please check:", ha_url)
+        logger.info("1. Your Home Assistant instance is running")
+        logger.info("2. Your token has the necessary permissions")
+        logger.info("3. You have Shelly devices configured in Home Assistant")
+        logger.info("4. The URL is correct and accessible")
+        return
     
+    logger.info("Export Summary (%s):", ha_url)
+    logger.info("- Successfully exported %d Shelly device entities", exported)
+    logger.info("- CSV file location: %s", output_file)
+    logger.info("CSV file contents preview:")
+    logger.info("-" * 60)
     try:
-        with open(output_file, 'w', newline='') as csvfile:
-            fieldnames = ['id', 'name']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for entity in entities:
-                writer.writerow(entity)
-        
-        print(f"Successfully exported {len(entities)} Shelly device entities to {output_file}")
-        # Check if file exists after writing
-        if os.path.exists(output_file):
-            print(f"Verified: File exists at {os.path.abspath(output_file)}")
-        else:
-            print(f"Warning: File was written but cannot be found at {os.path.abspath(output_file)}")
-    except PermissionError:
-        print(f"ERROR: Permission denied when writing to {output_file}")
-        print("Try specifying a different output location or run with administrator privileges")
-        return None
+        with open(output_file, 'r', encoding='utf-8') as f:
+            lines = f.readlines()[:min(6, exported + 1)]  # Header + up to 5 entities
+            for line in lines:
+                logger.info("%s", line.strip())
+        if exported > 5:
+            logger.info("... and %d more switch entities", exported - 5)
+        logger.info("-" * 60)
     except Exception as e:
-        print(f"Error writing to CSV file: {e}")
-        return None
-        
-    return output_file
+        logger.warning("Could not read file for preview: %s", e)
+
+class _ConsoleFormatter(logging.Formatter):
+    """Print bare messages, prefixing warnings and errors with their level"""
+
+    def format(self, record):
+        message = super().format(record)
+        if record.levelno >= logging.WARNING:
+            return f"{record.levelname}: {message}"
+        return message
 
 def main():
     parser = argparse.ArgumentParser(description='Export Shelly device entities from Home Assistant to CSV')
-    parser.add_argument('--url', required=False, help='Home Assistant URL (e.g., http://homeassistant.local:8123) (can also be set via HA_URL env var)')
-    parser.add_argument('--token', required=False, help='Long-lived access token for Home Assistant (can also be set via HA_TOKEN env var)')
-    parser.add_argument('--output', help='Output CSV file path (default: shelly_devices_<timestamp>.csv)')
+    parser.add_argument('--url', nargs='+', required=False, help='Home Assistant URL(s) (e.g., http://homeassistant.local:8123); several URLs are exported concurrently (can also be set via HA_URL env var)')
+    parser.add_argument('--token', nargs='+', required=False, help='Long-lived access token for Home Assistant; with several URLs, give one token per URL in the same order (can also be set via HA_TOKEN env var)')
+    parser.add_argument('--output', help='Output CSV file path (default: shelly_devices_<timestamp>.csv, or shelly_devices_delta_<timestamp>.csv with --since-last-run)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log each Shelly device entity as it is found')
+    parser.add_argument('--no-cache', action='store_true', help='Always download the full states, ignoring the ETag cache of previous exports')
+    parser.add_argument('--since-last-run', action='store_true', help='Only export entities added or renamed since the previous --since-last-run export; full exports do not move this baseline (implies --no-cache)')
+    parser.add_argument('--safe-csv', action='store_true', help='Write rows with the csv module instead of the fast built-in writer')
     
     # Load environment variables
     load_dotenv()
     
     args = parser.parse_args()
     
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(_ConsoleFormatter())
+    logging.basicConfig(handlers=[handler], level=logging.INFO)
+    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    
     # Get configuration from args or environment
-    token = args.token or os.getenv('HA_TOKEN')
-    ha_url = args.url or os.getenv('HA_URL')
+    tokens = args.token or ([os.getenv('HA_TOKEN')] if os.getenv('HA_TOKEN') else [])
+    ha_urls = args.url or ([os.getenv('HA_URL')] if os.getenv('HA_URL') else [])
     
-    if not ha_url:
-        print("Error: Home Assistant URL not provided. Please provide it via --url argument or HA_URL in .env file")
+    if not ha_urls:
+        logger.error("Home Assistant URL not provided. Please provide it via --url argument or HA_URL in .env file")
         sys.exit(1)
         
-    if not token:
-        print("Error: Token not provided. Please provide it via --token argument or HA_TOKEN in .env file")
+    if not tokens:
+        logger.error("Token not provided. Please provide it via --token argument or HA_TOKEN in .env file")
+        sys.exit(1)
+    
+    # Long-lived tokens are only valid for the instance that issued them
+    if len(tokens) != len(ha_urls):
+        logger.error("Got %d URL(s) but %d token(s). Please provide one --token per --url, in the same order", len(ha_urls), len(tokens))
+        sys.exit(1)
+    
+    instances = {}
+    for ha_url, token in zip(ha_urls, tokens):
+        ha_url = ha_url.rstrip('/')
+        if ha_url in instances:
+            logger.warning("Ignoring duplicate URL: %s", ha_url)
+            continue
+        instances[ha_url] = token
+    ha_urls = list(instances)
+    
+    logger.info("=" * 50)
+    logger.info("Home Assistant Shelly Device Entity Export Tool")
+    logger.info("=" * 50)
+    logger.info("Home Assistant URL: %s", ", ".join(ha_urls))
+    if len(ha_urls) == 1:
+        logger.info("Token provided: Yes (length: %d characters)", len(instances[ha_urls[0]]))
+    else:
+        logger.info("Tokens provided: %d (one per URL)", len(ha_urls))
+    logger.info("Output file: %s", args.output or "Auto-generated filename")
+    
+    output_file = args.output
+    if not output_file:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = "shelly_devices_delta" if args.since_last_run else "shelly_devices"
+        output_file = f"{prefix}_{timestamp}.csv"
+    if len(ha_urls) == 1:
+        output_files = [output_file]
+    else:
+        output_files = [_host_output_file(output_file, ha_url) for ha_url in ha_urls]
+    # Resolve once so logging and the ETag cache never need to stat or getcwd again
+    output_files = [os.fspath(Path(path).resolve()) for path in output_files]
+    if len(set(output_files)) != len(output_files):
+        logger.error("Several URLs share the same host and port, so their CSV files would collide. Please export them in separate runs")
         sys.exit(1)
     
-    print("=" * 50)
-    print("Home Assistant Shelly Device Entity Export Tool")
-    print("=" * 50)
-    print(f"Home Assistant URL: {ha_url}")
-    print(f"Token provided: {'Yes (length: ' + str(len(token)) + ' characters)' if token else 'No'}")
-    print(f"Output file: {args.output if args.output else 'Auto-generated filename'}")
+    # A 304 would reuse a full export, which is never the right answer for a delta
+    use_etags = not (args.no_cache or args.since_last_run)
+    etag_cache = _load_cache(ETAG_CACHE_FILE)
+    # Forget cached exports whose file this run overwrites, unless it is the same
+    # instance refreshing its own export through a conditional request
+    targets = dict(zip(output_files, ha_urls))
+    for states_url, entry in list(etag_cache.items()):
+        target_url = targets.get(entry.get("csv_path"))
+        if target_url is not None and not (use_etags and states_url == f"{target_url}/api/states"):
+            del etag_cache[states_url]
+    state_cache = _load_cache(STATE_CACHE_FILE) if args.since_last_run else None
+    
+    def export(ha_url, output_file):
+        with create_session(instances[ha_url]) as session:
+            return stream_shelly_to_csv(session, ha_url, output_file, args.safe_csv,
+                                        etag_cache if use_etags else None, state_cache)
     
     try:
-        print("\nFetching Shelly device entities from Home Assistant...")
-        entities = get_shelly_devices(ha_url, token)
-        
-        if not entities:
-            print("\nNo Shelly device entities found. Please check:")
-            print("1. Your Home Assistant instance is running")
-            print("2. Your token has the necessary permissions")
-            print("3. You have Shelly devices configured in Home Assistant")
-            print("4. The URL is correct and accessible")
-            return
+        logger.info("Exporting Shelly device entities from Home Assistant...")
+        # Fan out across instances so their round trips overlap; each worker uses its own session
+        with ThreadPoolExecutor(max_workers=min(len(ha_urls), 8)) as executor:
+            results = list(executor.map(export, ha_urls, output_files))
+        _save_cache(ETAG_CACHE_FILE, etag_cache)
+        if state_cache is not None:
+            _save_cache(STATE_CACHE_FILE, state_cache)
         
-        output_file = export_to_csv(entities, args.output)
-        
-        if output_file:
-            print("\nExport Summary:")
-            print(f"- Successfully exported {len(entities)} Shelly device entities")
-            print(f"- CSV file location: {os.path.abspath(output_file)}")
-            print("\nCSV file contents preview:")
-            print("-" * 60)
-            try:
-                with open(output_file, 'r') as f:
-                    lines = f.readlines()[:min(6, len(entities) + 1)]  # Header + up to 5 entities
-                    for line in lines:
-                        print(line.strip())
-                if len(entities) > 5:
-                    print(f"... and {len(entities) - 5} more switch entities")
-                print("-" * 60)
-            except Exception as e:
-                print(f"Could not read file for preview: {e}")
+        for ha_url, output_file, exported in zip(ha_urls, output_files, results):
+            log_export_summary(ha_url, output_file, exported, args.since_last_run)
     except Exception as e:
-        print(f"\nAn unexpected error occurred: {e}")
-        import traceback
-        traceback.print_exc()
-        print("\nPlease check your connection and try again.")
+        logger.exception("An unexpected error occurred: %s", e)
+        logger.error("Please check your connection and try again.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file